@@ -7,25 +7,32 @@ import io
 import json
 import logging
 import os
+import threading
 import uuid
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List, Optional
 from concurrent.futures import ThreadPoolExecutor 
+from functools import lru_cache
 import asyncio
 
 # Third-party
 import librosa
+import numba
 import numpy as np
-import tensorflow as tf
+import orjson
+import scipy.fft
+import xxhash
+import onnxruntime as ort
 import logging
 from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Body, status, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel, field_validator
 from sklearn.preprocessing import LabelEncoder
-from sqlalchemy import Column, String, Float, DateTime, select, delete
+from sqlalchemy import Column, String, Float, DateTime, select, delete, insert, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.exc import SQLAlchemyError 
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
@@ -33,6 +40,22 @@ from sqlalchemy.orm import sessionmaker
 from fastapi import Form  
 import base64
 
+# TFLite interpreter: prefer the lightweight tflite-runtime, fall back to the one bundled with TF
+try:
+    from tflite_runtime.interpreter import Interpreter, load_delegate
+except ImportError:
+    Interpreter = load_delegate = None
+
+# TensorRT is optional and only usable when a CUDA GPU is present
+try:
+    import tensorrt as trt
+    import pycuda.autoinit as cuda_autoinit  # Creates the CUDA context, fails without a GPU
+    import pycuda.driver as cuda
+except Exception:
+    trt = None
+else:
+    TRT_LOGGER = trt.Logger(trt.Logger.WARNING)
+
 # ======================
 # 1.1 Logger
 # ======================
@@ -43,19 +66,105 @@ logger.setLevel(logging.INFO)
 # 2. CONFIGURATION CLASS
 # ======================
 class Config:
-    MODEL_PATH = Path("catsound_class.keras")
-    LABEL_ENCODER_PATH = Path("label_encoder.json")
-    CAT_DETECTOR_MODEL_PATH = Path("../Model_Detection/cat_detector.keras")
-    CAT_DETECTOR_LABEL_ENCODER_PATH = Path("../Model_Detection/cat_detector_label_encoder.json")
-    MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
     BASE_DIR = Path(__file__).parent.absolute()  # Get the directory where main.py is located
+    MODEL_PATH = BASE_DIR / "catsound_class.keras"
+    LABEL_ENCODER_PATH = BASE_DIR / "label_encoder.json"
+    CAT_DETECTOR_MODEL_PATH = BASE_DIR / "Model_Detection" / "cat_detector.keras"
+    CAT_DETECTOR_LABEL_ENCODER_PATH = BASE_DIR / "Model_Detection" / "cat_detector_label_encoder.json"
+    MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+    # Minimum cat detector confidence to run the sound classifier. 0.5 is the old
+    # argmax behaviour of the binary detector; on the bundled Test_sound and
+    # static/audio clips (12 cat, 3 not) 0.8 cut recall from 7/12 to 5/12 and
+    # still passed the one false positive (p=0.82), so raise it only with more data
+    CAT_DETECTION_THRESHOLD = 0.5
+    LOW_CONFIDENCE_CAT_LABEL = "uncertain_cat"  # History label when "cat" is below the threshold
     STATIC_DIR = BASE_DIR / "static"
     AUDIO_DIR = STATIC_DIR / "audio"
+
+    # Feature extraction (must match the settings the models were trained with)
+    SAMPLE_RATE = 22050
+    REALTIME_SAMPLE_RATE = 48000  # Device's sample rate for raw PCM input
+    REALTIME_MAX_SECONDS = 10  # Initial size of the per-thread PCM conversion buffer
+    N_FFT = 2048
+    HOP_LENGTH = 512
+    STFT_PAD_MODE = "constant"  # librosa >= 0.10 default for center=True (older versions used "reflect")
+    N_MELS = 64
+    MAX_PAD_LEN = 105
+    # Feature tensor (batch, time frames, mel bands, channels). The detector takes it
+    # as is; the Conv1D sound classifier has no channel axis, so backends reshape
+    # it to each model's own input shape
+    INPUT_SHAPE = (1, MAX_PAD_LEN, N_MELS, 1)
+    BATCH_INPUT_SHAPE = (None,) + INPUT_SHAPE[1:]
+
+    # Micro-batching of concurrent requests into a single model call
+    MAX_BATCH_SIZE = 8
+    MAX_BATCH_WAIT = 0.008  # seconds
+
+    # Thread pools: audio decoding and model inference are kept apart so they don't contend
+    PREPROCESS_WORKERS = 2
+    # Model calls allowed in flight at once. The runtimes already parallelise each
+    # call across all cores, more concurrent calls just oversubscribe them
+    MODEL_CONCURRENCY = 1
+
+    # LRU caches for repeated audio, keyed by an xxh3 hash of the raw bytes
+    FEATURE_CACHE_SIZE = 256  # ~27KB per entry
+    PREDICTION_CACHE_SIZE = 256
+
+    # Prediction rows are buffered and committed together
+    DB_WRITE_BATCH_SIZE = 64
+    DB_WRITE_BATCH_WAIT = 0.05  # seconds
+
+    # Converted models are built from the .keras files and cached on disk next to
+    # them, each with a .xxh3 stamp of the .keras file it came from. The ONNX models
+    # are committed, so TensorFlow is only imported after a .keras file changes
+    # (or as a last resort)
+    MODEL_ONNX_PATH = BASE_DIR / "catsound_class.onnx"
+    CAT_DETECTOR_ONNX_PATH = BASE_DIR / "Model_Detection" / "cat_detector.onnx"
+
+    # INT8 TFLite inference instead of ONNX Runtime
+    USE_TFLITE = False
+    MODEL_TFLITE_PATH = BASE_DIR / "catsound_class_int8.tflite"
+    CAT_DETECTOR_TFLITE_PATH = BASE_DIR / "Model_Detection" / "cat_detector_int8.tflite"
+    CALIBRATION_DIRS = [BASE_DIR / "Test_sound", AUDIO_DIR]  # Representative audio for quantization
+    CALIBRATION_SAMPLES = 100
+    XNNPACK_DELEGATE_PATH = None  # e.g. "libxnnpack.so"; recent TFLite builds apply XNNPACK by default
+
+    # TensorRT INT8 engines, preferred over TFLite when a CUDA GPU is available
+    USE_TENSORRT = True
+    MODEL_TRT_PATH = BASE_DIR / "catsound_class_int8.plan"
+    CAT_DETECTOR_TRT_PATH = BASE_DIR / "Model_Detection" / "cat_detector_int8.plan"
     
     # Initialize directories
     AUDIO_DIR.mkdir(parents=True, exist_ok=True)
 
-executor = ThreadPoolExecutor(max_workers=4)
+preprocess_pool = ThreadPoolExecutor(max_workers=Config.PREPROCESS_WORKERS)
+predict_pool = ThreadPoolExecutor(max_workers=Config.MODEL_CONCURRENCY)
+
+def available_cpus() -> int:
+    """CPUs this process can actually use: the affinity mask, capped by a container CPU quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # sched_getaffinity is Linux-only
+        cpus = os.cpu_count() or 1
+
+    # cgroup v2 exposes "<quota> <period>", v1 splits them across two files
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+    except (OSError, ValueError):
+        try:
+            quota = Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read_text().strip()
+            period = Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read_text().strip()
+        except OSError:
+            return cpus
+    if quota not in ("max", "-1"):
+        cpus = min(cpus, max(1, int(quota) // int(period)))
+    return cpus
+
+# Inference threads per model call (TFLite, ONNX Runtime and TF intra-op)
+NUM_THREADS = available_cpus()
+
+# STFT threads per preprocess worker, split so the workers don't oversubscribe the CPUs
+FFT_WORKERS = max(1, NUM_THREADS // Config.PREPROCESS_WORKERS)
 
 # ======================
 # 3. DATABASE SETUP
@@ -75,10 +184,74 @@ SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./predictions.db"
 engine = create_async_engine(SQLALCHEMY_DATABASE_URL)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+@event.listens_for(engine.sync_engine, "connect")
+def set_sqlite_pragma(dbapi_connection, connection_record):
+    """WAL lets readers run during writes; NORMAL only fsyncs at checkpoints"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+class PredictionWriter:
+    """Buffers prediction rows and inserts them in batches with a single commit.
+
+    Rows are written after the response is sent, so a failed insert can't reach
+    the client: a reused file_id is only logged and that row is dropped, where
+    it used to fail the request with a 500.
+    """
+    def __init__(self, max_batch_size: int, max_wait: float):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue = None
+        self.task = None
+
+    def start(self):
+        """Start the writer task, must be called from the running event loop"""
+        self.queue = asyncio.Queue()
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush queued rows and stop the writer task"""
+        await self.queue.put(None)
+        await self.task
+
+    def submit(self, row: dict):
+        """Queue a row for insertion without waiting for the commit (errors are only logged)"""
+        self.queue.put_nowait(row)
+
+    async def _run(self):
+        while True:
+            rows = await collect_batch(self.queue, self.max_batch_size, self.max_wait)
+            stopping = None in rows
+            rows = [row for row in rows if row is not None]
+            if rows:
+                try:
+                    await self._insert(rows)
+                except Exception as e:
+                    # Keep the writer alive, otherwise every later row would queue forever
+                    logger.error(f"Failed to store {len(rows)} predictions: {str(e)}")
+            if stopping:
+                return
+
+    async def _insert(self, rows: List[dict]):
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(Prediction), rows)
+                await db.commit()
+        except SQLAlchemyError as e:
+            if len(rows) == 1:
+                logger.error(f"Failed to store prediction {rows[0]['id']}: {str(e)}")
+                return
+            # One bad row (e.g. a reused file_id) shouldn't drop the rest of the batch
+            for row in rows:
+                await self._insert([row])
+
+prediction_writer = PredictionWriter(Config.DB_WRITE_BATCH_SIZE, Config.DB_WRITE_BATCH_WAIT)
+
 # ======================
 # 4. PYDANTIC MODELS (Request/Response)
 # ======================
@@ -95,6 +268,7 @@ class PredictionResponse(BaseModel):
     audio_url: str
     probabilities: Dict[str, float]
     cat_sound_probabilities: Optional[Dict[str, float]] = None
+    message: Optional[str] = None
 
 class HistoryResponse(BaseModel):
     id: str
@@ -108,6 +282,119 @@ class HistoryResponse(BaseModel):
 # 5. CORE FUNCTIONALITY
 # ======================
 # ---- 5.1 Audio Preprocessing ----
+# STFT window and mel filterbanks never change, build them once instead of per request.
+# Filterbanks are stored transposed (n_fft // 2 + 1, n_mels) so the mel spectrogram
+# comes out time-major, the same layout as the model input
+HANN_WINDOW = librosa.filters.get_window("hann", Config.N_FFT, fftbins=True).astype(np.float32)
+MEL_FILTERBANKS = {
+    sr: np.ascontiguousarray(
+        librosa.filters.mel(sr=sr, n_fft=Config.N_FFT, n_mels=Config.N_MELS).T, dtype=np.float32
+    )
+    for sr in (Config.SAMPLE_RATE, Config.REALTIME_SAMPLE_RATE)
+}
+
+def compute_mel_spectrogram(audio: np.ndarray, sr: int) -> np.ndarray:
+    """Same result as librosa.feature.melspectrogram (librosa >= 0.10), transposed to (frames, n_mels)"""
+    # Centered frames, like librosa.stft(center=True)
+    padded = np.pad(audio, Config.N_FFT // 2, mode=Config.STFT_PAD_MODE)
+    frames = np.lib.stride_tricks.sliding_window_view(padded, Config.N_FFT)[::Config.HOP_LENGTH]
+    power = np.abs(scipy.fft.rfft(frames * HANN_WINDOW, workers=FFT_WORKERS)) ** 2
+    return power @ MEL_FILTERBANKS[sr]
+
+# All fast-math flags except nnan/ninf, so the NaN/inf check survives compilation.
+# Serial on purpose: it is called from several preprocess threads at once, which
+# numba's default workqueue threading layer can't handle, and the arrays are tiny
+@numba.njit(
+    "boolean(float32[:, ::1], float32[:, ::1])",
+    cache=True,
+    fastmath={"nsz", "arcp", "contract", "afn", "reassoc"},
+    error_model="numpy"
+)
+def finalize_mel_spectrogram(mel_spec, out):
+    """Fused power_to_db(ref=np.max) + edge pad/crop + z-score normalization into out.
+
+    Both arrays are time-major, (frames, n_mels) and (max_pad_len, n_mels).
+    Returns False if mel_spec contains NaN or inf values.
+    """
+    n_frames, n_mels = mel_spec.shape
+    max_pad_len = out.shape[0]
+    used = min(n_frames, max_pad_len)
+
+    # Pass 1: peak power (the dB reference) and validity check
+    peak = 0.0
+    for t in range(n_frames):
+        for m in range(n_mels):
+            value = mel_spec[t, m]
+            if not np.isfinite(value):
+                return False
+            if value > peak:
+                peak = value
+    ref_db = 10.0 * np.log10(max(peak, 1e-10))
+
+    # Pass 2: dB conversion (librosa's amin=1e-10, top_db=80 below the peak)
+    # of the frames that fit, with running sums for the statistics. The last
+    # frame's sums are kept apart since edge padding repeats it
+    total = 0.0
+    sq_total = 0.0
+    last_sum = 0.0
+    last_sq_sum = 0.0
+    for t in range(used):
+        last_sum = 0.0
+        last_sq_sum = 0.0
+        for m in range(n_mels):
+            value = max(10.0 * np.log10(max(mel_spec[t, m], 1e-10)) - ref_db, -80.0)
+            out[t, m] = value
+            last_sum += value
+            last_sq_sum += value * value
+        total += last_sum
+        sq_total += last_sq_sum
+
+    # Edge padding: repeat the last frame up to max_pad_len
+    pad_frames = max_pad_len - used
+    for t in range(used, max_pad_len):
+        for m in range(n_mels):
+            out[t, m] = out[used - 1, m]
+
+    # Pass 3: z-score normalization in place
+    size = n_mels * max_pad_len
+    mean = (total + last_sum * pad_frames) / size
+    mean_sq = (sq_total + last_sq_sum * pad_frames) / size
+    std = np.sqrt(max(mean_sq - mean * mean, 0.0))
+    for t in range(max_pad_len):
+        for m in range(n_mels):
+            out[t, m] = (out[t, m] - mean) / std
+    return True
+
+def extract_features(audio: np.ndarray, sr: int) -> np.ndarray:
+    """Convert a waveform to a padded, normalized (1, 105, 64, 1) model input"""
+    mel_spec = compute_mel_spectrogram(audio, sr)
+
+    # Written in place by the kernel, so the model input is contiguous without a
+    # transpose copy. Allocated per call rather than reused: the batcher queue and
+    # the feature cache keep references to it after this returns
+    features = np.empty(Config.INPUT_SHAPE, dtype=np.float32)
+    if not finalize_mel_spectrogram(mel_spec, features[0, :, :, 0]):
+        raise ValueError("Invalid values in mel spectrogram")
+    return features
+
+# Per-thread scratch buffer for PCM conversion; each worker thread gets its own,
+# so concurrent realtime requests never share one
+_pcm_scratch = threading.local()
+
+def pcm16_to_float(audio_data: bytes) -> np.ndarray:
+    """Convert 16-bit PCM bytes to float32 in [-1, 1) without allocating per call.
+
+    The result is a view of a thread-local buffer, valid until the next call on the same thread.
+    """
+    pcm = np.frombuffer(audio_data, dtype=np.int16)
+    buffer = getattr(_pcm_scratch, "buffer", None)
+    if buffer is None or len(buffer) < len(pcm):
+        size = max(len(pcm), Config.REALTIME_SAMPLE_RATE * Config.REALTIME_MAX_SECONDS)
+        buffer = _pcm_scratch.buffer = np.empty(size, dtype=np.float32)
+    audio = buffer[:len(pcm)]
+    np.multiply(pcm, 1.0 / 32768.0, out=audio, dtype=np.float32, casting="unsafe")
+    return audio
+
 def process_audio_file(audio_data: bytes) -> np.ndarray:
     """Convert raw audio to Mel spectrogram"""
     try:
@@ -115,27 +402,12 @@ def process_audio_file(audio_data: bytes) -> np.ndarray:
             raise ValueError("Empty audio data received")
 
         audio_stream = io.BytesIO(audio_data)
-        audio, sr = librosa.load(audio_stream, sr=22050)
+        audio, sr = librosa.load(audio_stream, sr=Config.SAMPLE_RATE)
         
         if len(audio) == 0:
             raise ValueError("No audio data after loading")
         
-        mel_spec = librosa.feature.melspectrogram(y=audio, sr=sr, n_mels=64, hop_length=512)
-        mel_spec_db = librosa.power_to_db(mel_spec, ref=np.max)
-        
-        max_pad_len = 105
-        if mel_spec_db.shape[1] > max_pad_len:
-            mel_spec_db = mel_spec_db[:, :max_pad_len]
-        else:
-            pad_width = max_pad_len - mel_spec_db.shape[1]
-            mel_spec_db = np.pad(mel_spec_db, ((0, 0), (0, pad_width)), mode='edge')
-        
-        # Check for invalid values before normalization
-        if np.isnan(mel_spec_db).any() or np.isinf(mel_spec_db).any():
-            raise ValueError("Invalid values in mel spectrogram")
-        
-        mel_spec_db = (mel_spec_db - np.mean(mel_spec_db)) / np.std(mel_spec_db)
-        return mel_spec_db.T[np.newaxis, ..., np.newaxis]
+        return extract_features(audio, sr)
     
     except Exception as e:
         logger.error(f"Audio processing failed: {str(e)}")
@@ -147,31 +419,15 @@ def process_realtime_audio(audio_data: bytes) -> np.ndarray:
         if len(audio_data) == 0:
             raise ValueError("Empty audio data received")
 
-        # Convert bytes to numpy array assuming 16-bit PCM
-        audio = np.frombuffer(audio_data, dtype=np.int16)
-        # Convert to float32 and normalize
-        audio = audio.astype(np.float32) / 32768.0
-        sr = 48000  # Device's sample rate
+        # 16-bit PCM to normalized float32 (compute_mel_spectrogram copies it
+        # while padding, so reusing the scratch buffer is safe)
+        audio = pcm16_to_float(audio_data)
+        sr = Config.REALTIME_SAMPLE_RATE
         
         if len(audio) == 0:
             raise ValueError("No audio data after loading")
         
-        mel_spec = librosa.feature.melspectrogram(y=audio, sr=sr, n_mels=64, hop_length=512)
-        mel_spec_db = librosa.power_to_db(mel_spec, ref=np.max)
-        
-        max_pad_len = 105
-        if mel_spec_db.shape[1] > max_pad_len:
-            mel_spec_db = mel_spec_db[:, :max_pad_len]
-        else:
-            pad_width = max_pad_len - mel_spec_db.shape[1]
-            mel_spec_db = np.pad(mel_spec_db, ((0, 0), (0, pad_width)), mode='edge')
-        
-        # Check for invalid values before normalization
-        if np.isnan(mel_spec_db).any() or np.isinf(mel_spec_db).any():
-            raise ValueError("Invalid values in mel spectrogram")
-        
-        mel_spec_db = (mel_spec_db - np.mean(mel_spec_db)) / np.std(mel_spec_db)
-        return mel_spec_db.T[np.newaxis, ..., np.newaxis]
+        return extract_features(audio, sr)
     
     except Exception as e:
         logger.error(f"Realtime audio processing failed: {str(e)}")
@@ -189,13 +445,24 @@ def save_audio_file(filename: str, audio_data: bytes) -> str:
         save_path = Config.AUDIO_DIR / original_filename
         
         # Handle duplicate filenames by adding (1), (2), etc.
-        while save_path.exists():
-            new_filename = f"{base_name} ({counter}){ext}"
-            save_path = Config.AUDIO_DIR / new_filename
-            counter += 1
-        
-        with open(save_path, 'wb') as f:
-            f.write(audio_data)
+        # Exclusive create, since concurrent uploads save from worker threads
+        while True:
+            try:
+                f = open(save_path, 'xb')
+            except FileExistsError:
+                new_filename = f"{base_name} ({counter}){ext}"
+                save_path = Config.AUDIO_DIR / new_filename
+                counter += 1
+                continue
+
+            # The name is now reserved; don't leave a partial file if the write fails
+            try:
+                with f:
+                    f.write(audio_data)
+            except Exception:
+                save_path.unlink(missing_ok=True)
+                raise
+            break
             
         return save_path.name  # Return just the filename part
     
@@ -203,39 +470,495 @@ def save_audio_file(filename: str, audio_data: bytes) -> str:
         logger.error(f"Failed to save audio file: {str(e)}")
         raise
 
+async def discard_saved_audio(save_task: asyncio.Task):
+    """Wait for a background save and delete the file, for requests that failed"""
+    try:
+        saved_filename = await save_task
+    except Exception:
+        return  # Nothing was written; save_audio_file already logged the error
+    (Config.AUDIO_DIR / saved_filename).unlink(missing_ok=True)
+
 # ---- 5.2 Model Loading ----
-def load_model_assets(model_path, label_encoder_path):
-    """Load TF model and label encoder"""
+def load_label_encoder(label_encoder_path):
+    """Load label encoder classes"""
     try:
-        if not model_path.exists():
-            raise FileNotFoundError(f"Model file not found at {model_path}")
         if not label_encoder_path.exists():
             raise FileNotFoundError(f"Label encoder file not found at {label_encoder_path}")
 
-        model = tf.keras.models.load_model(model_path)
-        model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
-        
         with open(label_encoder_path, "r") as f:
             label_encoder_classes = json.load(f)
         
         label_encoder = LabelEncoder()
         label_encoder.classes_ = np.array(label_encoder_classes)
         
-        return model, label_encoder
+        return label_encoder
     
     except Exception as e:
-        logger.error(f"Failed to load model assets: {str(e)}")
+        logger.error(f"Failed to load label encoder: {str(e)}")
         raise
 
+@lru_cache(maxsize=None)
+def import_tensorflow():
+    """Import TF on first use; it is only needed to convert models or as a fallback backend"""
+    import tensorflow as tf
+
+    # One model call at a time uses every core through intra-op threads; inter-op
+    # parallelism only adds contention. Must be set before TF initialises its runtime.
+    tf.config.threading.set_intra_op_parallelism_threads(NUM_THREADS)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    return tf
+
+def load_keras_model(model_path: Path):
+    """Load a Keras model for conversion or TF inference"""
+    if not model_path.exists():
+        raise FileNotFoundError(f"Model file not found at {model_path}")
+    tf = import_tensorflow()
+    # Inference only: no compile() needed, it only adds optimizer/loss state
+    return tf.keras.models.load_model(model_path, compile=False)
+
+def build_inference_fn(model):
+    """Trace model into a tf.function with a fixed input signature and warm it up"""
+    tf = import_tensorflow()
+
+    @tf.function(input_signature=[tf.TensorSpec(Config.BATCH_INPUT_SHAPE, tf.float32)])
+    def infer(x):
+        return model(x, training=False)
+
+    # Trigger tracing at startup so the first request doesn't pay for it
+    infer(tf.zeros(Config.INPUT_SHAPE, tf.float32))
+    return lambda features: infer(tf.convert_to_tensor(features, dtype=tf.float32)).numpy()
+
+def load_calibration_features():
+    """Yield mel spectrograms of local audio samples for INT8 calibration"""
+    count = 0
+    for directory in Config.CALIBRATION_DIRS:
+        for wav_path in sorted(Path(directory).glob("*.wav")):
+            if count >= Config.CALIBRATION_SAMPLES:
+                return
+            try:
+                yield process_audio_file(wav_path.read_bytes())
+                count += 1
+            except ValueError:
+                logger.warning(f"Skipping calibration sample {wav_path}")
+    if count == 0:
+        raise FileNotFoundError("No calibration audio found for INT8 quantization")
+
+def hash_stamp(converted_path: Path) -> Path:
+    """Sidecar file holding the xxh3 of the .keras model a file was converted from"""
+    return converted_path.with_name(converted_path.name + ".xxh3")
+
+def is_converted_from(converted_path: Path, model_hash: str) -> bool:
+    """True if converted_path exists and was built from the model with this hash"""
+    if not converted_path.exists():
+        return False
+    stamp = hash_stamp(converted_path)
+    if stamp.exists() and stamp.read_text() == model_hash:
+        return True
+    logger.warning(f"{converted_path} was built from a different model file, rebuilding it")
+    return False
+
+def export_to_onnx(model_path: Path, output_path: Path, model_hash: str):
+    """Convert a Keras model to ONNX with its own input shape and a dynamic batch dimension"""
+    # Keras 3 models need Keras' exporter (Keras >= 3.6); tf2onnx.convert.from_keras
+    # only understands legacy tf.keras models
+    model = load_keras_model(model_path)
+    # The exporter needs a model that has been called at least once
+    model(np.zeros((1,) + model.input_shape[1:], dtype=np.float32))
+    model.export(str(output_path), format="onnx")
+    hash_stamp(output_path).write_text(model_hash)
+    logger.info(f"Saved ONNX model to {output_path}")
+
+def convert_to_int8_tflite(model_path: Path, output_path: Path, model_hash: str):
+    """Quantize a Keras model to a full-integer TFLite model"""
+    model = load_keras_model(model_path)
+    sample_shape = (1,) + model.input_shape[1:]
+
+    # The interpreter runs one sample at a time, so convert for batch size 1 with
+    # recurrent layers unrolled: the sound classifier's LSTM otherwise becomes a
+    # while loop, which full-integer calibration can't handle
+    config = model.get_config()
+    config["layers"][0]["config"]["batch_shape"] = list(sample_shape)
+    for layer in config["layers"]:
+        if "unroll" in layer["config"]:
+            layer["config"]["unroll"] = True
+    fixed_model = type(model).from_config(config)
+    fixed_model.set_weights(model.get_weights())
+
+    def representative_dataset():
+        for features in load_calibration_features():
+            yield [features.reshape(sample_shape)]
+
+    tf = import_tensorflow()
+    converter = tf.lite.TFLiteConverter.from_keras_model(fixed_model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    converter.inference_output_type = tf.int8
+    output_path.write_bytes(converter.convert())
+    hash_stamp(output_path).write_text(model_hash)
+    logger.info(f"Saved INT8 TFLite model to {output_path}")
+
+class TFLiteModel:
+    """Persistent INT8 TFLite interpreter that takes and returns float arrays"""
+    def __init__(self, model_path: Path):
+        interpreter_cls, delegate_loader = Interpreter, load_delegate
+        if interpreter_cls is None:
+            tf = import_tensorflow()
+            interpreter_cls, delegate_loader = tf.lite.Interpreter, tf.lite.experimental.load_delegate
+
+        delegates = []
+        if Config.XNNPACK_DELEGATE_PATH:
+            delegates.append(delegate_loader(Config.XNNPACK_DELEGATE_PATH))
+
+        self.interpreter = interpreter_cls(
+            model_path=str(model_path),
+            num_threads=NUM_THREADS,
+            experimental_delegates=delegates
+        )
+        self.interpreter.allocate_tensors()
+        # Interpreters are not thread-safe and requests run on a thread pool
+        self.lock = threading.Lock()
+
+        input_details = self.interpreter.get_input_details()[0]
+        output_details = self.interpreter.get_output_details()[0]
+        self.input_index = input_details["index"]
+        self.input_shape = tuple(input_details["shape"])
+        self.input_scale, self.input_zero_point = input_details["quantization"]
+        self.output_index = output_details["index"]
+        self.output_scale, self.output_zero_point = output_details["quantization"]
+
+        # Warm up so the first request doesn't pay for kernel preparation
+        self(np.zeros(Config.INPUT_SHAPE, dtype=np.float32))
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        quantized = np.round(features / self.input_scale + self.input_zero_point)
+        quantized = np.clip(quantized, -128, 127).astype(np.int8)
+        # The interpreter is allocated for batch size 1; resizing per batch would
+        # reallocate every tensor, so batched input is invoked sample by sample
+        interpreter = self.interpreter
+        input_index, output_index, input_shape = self.input_index, self.output_index, self.input_shape
+        outputs = []
+        with self.lock:
+            for sample in quantized:
+                interpreter.set_tensor(input_index, sample.reshape(input_shape))
+                interpreter.invoke()
+                outputs.append(interpreter.get_tensor(output_index)[0])
+        output = np.stack(outputs)
+        return (output.astype(np.float32) - self.output_zero_point) * self.output_scale
+
+class ONNXModel:
+    """ONNX Runtime session that takes and returns float arrays"""
+    def __init__(self, model_path: Path):
+        options = ort.SessionOptions()
+        # Same threading policy as TF: one call uses every core, no inter-op parallelism
+        options.intra_op_num_threads = NUM_THREADS
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(model_path),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Exported with the model's own input shape, e.g. the sound classifier has no channel axis
+        self.sample_shape = tuple(model_input.shape[1:])
+
+        # Warm up so the first request doesn't pay for lazy initialisation
+        self(np.zeros(Config.INPUT_SHAPE, dtype=np.float32))
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        features = features.reshape((len(features),) + self.sample_shape)
+        return self.session.run(None, {self.input_name: features})[0]
+
+def build_tensorrt_engine(onnx_path: Path, engine_path: Path, model_hash: str):
+    """Build a calibrated INT8 TensorRT engine from an ONNX model"""
+    calibration_cache = engine_path.with_suffix(".calib")
+
+    builder = trt.Builder(TRT_LOGGER)
+    network = builder.create_network(1 << int(trt.NetworkDefinitionCreationFlag.EXPLICIT_BATCH))
+    parser = trt.OnnxParser(network, TRT_LOGGER)
+    if not parser.parse(onnx_path.read_bytes()):
+        raise RuntimeError(f"Failed to parse ONNX model: {parser.get_error(0)}")
+
+    # Shapes come from the ONNX model, e.g. the sound classifier has no channel axis
+    model_input = network.get_input(0)
+    sample_shape = tuple(model_input.shape)[1:]
+    single_shape = (1,) + sample_shape
+
+    class MelCalibrator(trt.IInt8EntropyCalibrator2):
+        """Feeds mel spectrograms to TensorRT to pick INT8 ranges, one at a time"""
+        def __init__(self):
+            super().__init__()
+            self.samples = load_calibration_features()
+            self.device_input = cuda.mem_alloc(int(np.prod(single_shape)) * 4)
+
+        def get_batch_size(self):
+            return 1
+
+        def get_batch(self, names):
+            features = next(self.samples, None)
+            if features is None:
+                return None
+            features = np.ascontiguousarray(features.reshape(single_shape), dtype=np.float32)
+            cuda.memcpy_htod(self.device_input, features)
+            return [int(self.device_input)]
+
+        def read_calibration_cache(self):
+            if is_converted_from(calibration_cache, model_hash):
+                return calibration_cache.read_bytes()
+            return None
+
+        def write_calibration_cache(self, cache):
+            calibration_cache.write_bytes(cache)
+            hash_stamp(calibration_cache).write_text(model_hash)
+
+    # Dynamic batch dimension so micro-batches run as a single engine call; most
+    # calls carry a single request, so kernels are tuned for batch 1
+    max_batch_shape = (Config.MAX_BATCH_SIZE,) + sample_shape
+    profile = builder.create_optimization_profile()
+    profile.set_shape(model_input.name, single_shape, single_shape, max_batch_shape)
+    # Calibration runs at its profile's opt shape, so it gets a fixed batch-1
+    # profile matching the calibrator's one-sample buffer
+    calibration_profile = builder.create_optimization_profile()
+    calibration_profile.set_shape(model_input.name, single_shape, single_shape, single_shape)
+
+    config = builder.create_builder_config()
+    config.add_optimization_profile(profile)
+    config.set_calibration_profile(calibration_profile)
+    config.set_flag(trt.BuilderFlag.INT8)
+    config.int8_calibrator = MelCalibrator()
+    serialized_engine = builder.build_serialized_network(network, config)
+    if serialized_engine is None:
+        raise RuntimeError("TensorRT engine build failed")
+
+    engine_path.write_bytes(serialized_engine)
+    hash_stamp(engine_path).write_text(model_hash)
+    logger.info(f"Saved TensorRT INT8 engine to {engine_path}")
+
+class TensorRTModel:
+    """TensorRT engine with pinned host buffers that takes and returns float arrays"""
+    def __init__(self, engine_path: Path):
+        runtime = trt.Runtime(TRT_LOGGER)
+        self.engine = runtime.deserialize_cuda_engine(engine_path.read_bytes())
+        self.context = self.engine.create_execution_context()
+        self.stream = cuda.Stream()
+        # Requests run on worker threads, the CUDA context has to be pushed on each call
+        self.cuda_context = cuda_autoinit.context
+        self.lock = threading.Lock()
+
+        # Name-based tensor API (TensorRT >= 8.5), the binding-index API is gone in 10
+        tensor_names = {}
+        for i in range(self.engine.num_io_tensors):
+            name = self.engine.get_tensor_name(i)
+            tensor_names[self.engine.get_tensor_mode(name)] = name
+        self.input_name = tensor_names[trt.TensorIOMode.INPUT]
+        self.output_name = tensor_names[trt.TensorIOMode.OUTPUT]
+
+        # Buffers are sized for the largest batch, smaller batches use a prefix
+        sample_shape = tuple(self.engine.get_tensor_shape(self.input_name))[1:]
+        num_classes = self.engine.get_tensor_shape(self.output_name)[-1]
+        self.host_input = cuda.pagelocked_empty((Config.MAX_BATCH_SIZE,) + sample_shape, dtype=np.float32)
+        self.host_output = cuda.pagelocked_empty((Config.MAX_BATCH_SIZE, num_classes), dtype=np.float32)
+        self.device_input = cuda.mem_alloc(self.host_input.nbytes)
+        self.device_output = cuda.mem_alloc(self.host_output.nbytes)
+        # The device buffers never move, so their addresses are bound once
+        self.context.set_tensor_address(self.input_name, int(self.device_input))
+        self.context.set_tensor_address(self.output_name, int(self.device_output))
+
+        # Warm up so the first request doesn't pay for lazy CUDA initialisation
+        self(np.zeros(Config.INPUT_SHAPE, dtype=np.float32))
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        with self.lock:
+            self.cuda_context.push()
+            try:
+                batch_size = len(features)
+                host_input = self.host_input[:batch_size]
+                np.copyto(host_input, features.reshape(host_input.shape))
+                self.context.set_input_shape(self.input_name, host_input.shape)
+                cuda.memcpy_htod_async(self.device_input, host_input, self.stream)
+                self.context.execute_async_v3(stream_handle=self.stream.handle)
+                cuda.memcpy_dtoh_async(self.host_output[:batch_size], self.device_output, self.stream)
+                self.stream.synchronize()
+                return self.host_output[:batch_size].copy()
+            finally:
+                self.cuda_context.pop()
+
+def load_inference_fn(model_path: Path, onnx_path: Path, tflite_path: Path, engine_path: Path):
+    """Return the fastest available inference callable for a model.
+
+    Converted models are only reused while their hash stamp matches model_path,
+    so replacing a .keras file rebuilds them instead of serving the old model.
+    """
+    model_hash = xxhash.xxh3_64_hexdigest(model_path.read_bytes())
+    if Config.USE_TENSORRT and trt is not None:
+        try:
+            if not is_converted_from(engine_path, model_hash):
+                if not is_converted_from(onnx_path, model_hash):
+                    export_to_onnx(model_path, onnx_path, model_hash)
+                build_tensorrt_engine(onnx_path, engine_path, model_hash)
+            return TensorRTModel(engine_path)
+        except Exception as e:
+            logger.error(f"TensorRT unavailable for {engine_path}: {str(e)}")
+    if Config.USE_TFLITE:
+        try:
+            if not is_converted_from(tflite_path, model_hash):
+                convert_to_int8_tflite(model_path, tflite_path, model_hash)
+            return TFLiteModel(tflite_path)
+        except Exception as e:
+            logger.error(f"INT8 TFLite unavailable for {tflite_path}: {str(e)}")
+    try:
+        if not is_converted_from(onnx_path, model_hash):
+            export_to_onnx(model_path, onnx_path, model_hash)
+        return ONNXModel(onnx_path)
+    except Exception as e:
+        logger.error(f"ONNX Runtime unavailable for {onnx_path}, falling back to the slower TF model: {str(e)}")
+    return build_inference_fn(load_keras_model(model_path))
+
+async def collect_batch(queue: asyncio.Queue, max_size: int, max_wait: float) -> list:
+    """Wait for one queue item, then gather more until max_size items or max_wait seconds"""
+    loop = asyncio.get_running_loop()
+    batch = [await queue.get()]
+    deadline = loop.time() + max_wait
+    while len(batch) < max_size:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+class Batcher:
+    """Collects concurrent requests and runs them through a model as one batch"""
+    def __init__(self, infer_fn, max_batch_size: int, max_wait: float):
+        self.infer_fn = infer_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue = None
+        self.task = None
+        self.semaphore = None
+
+    def start(self, semaphore: asyncio.Semaphore):
+        """Start the consumer task, must be called from the running event loop.
+
+        The semaphore is shared by all batchers to bound concurrent model calls.
+        """
+        self.semaphore = semaphore
+        self.queue = asyncio.Queue()
+        self.task = asyncio.create_task(self._run())
+
+    async def submit(self, features: np.ndarray) -> np.ndarray:
+        """Queue a (1, ...) feature tensor and wait for its probabilities"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((features, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await collect_batch(self.queue, self.max_batch_size, self.max_wait)
+            features = np.concatenate([item[0] for item in batch])
+            try:
+                async with self.semaphore:
+                    proba = await loop.run_in_executor(predict_pool, self.infer_fn, features)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), row in zip(batch, proba):
+                # Skip requests whose client went away while waiting
+                if not future.done():
+                    future.set_result(row)
+
+def skipped_stage2_message(cat_detector_pred_class: int) -> str:
+    """Explain why the sound classifier didn't run"""
+    if cat_detector_pred_class == CAT_IDX:
+        return "Low-confidence cat detection"
+    return "Not a cat sound"
+
+def top1(proba: np.ndarray):
+    """Index and probability of the top class in a single pass"""
+    idx = int(proba.argmax())
+    return idx, float(proba[idx])
+
+class LRUCache:
+    """Bounded LRU mapping; only used from the event loop, so no locking is needed"""
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+
+    def get(self, key):
+        value = self.data.get(key)
+        if value is not None:
+            self.data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+feature_cache = LRUCache(Config.FEATURE_CACHE_SIZE)
+prediction_cache = LRUCache(Config.PREDICTION_CACHE_SIZE)
+
+async def get_features(audio_data: bytes, process_fn):
+    """Preprocess audio on the preprocess pool unless the same bytes were seen recently.
+
+    Returns the cache key (reused for prediction caching) and the features.
+    """
+    # Hash once with xxh3 instead of letting a dict hash the full bytes on every lookup
+    key = (process_fn.__name__, xxhash.xxh3_64_intdigest(audio_data))
+    features = feature_cache.get(key)
+    if features is None:
+        features = await asyncio.get_running_loop().run_in_executor(
+            preprocess_pool,
+            process_fn,
+            audio_data
+        )
+        feature_cache.put(key, features)
+    return key, features
+
+async def get_prediction(batcher: "Batcher", key, features: np.ndarray) -> np.ndarray:
+    """Run features through a model's batcher unless the result is cached"""
+    proba = prediction_cache.get((batcher, key))
+    if proba is None:
+        proba = await batcher.submit(features)
+        prediction_cache.put((batcher, key), proba)
+    return proba
+
 try:
     # Load cat detector model and label encoder
-    cat_detector_model, cat_detector_label_encoder = load_model_assets(
-        Config.CAT_DETECTOR_MODEL_PATH, Config.CAT_DETECTOR_LABEL_ENCODER_PATH
+    cat_detector_label_encoder = load_label_encoder(Config.CAT_DETECTOR_LABEL_ENCODER_PATH)
+    cat_detector_fn = load_inference_fn(
+        Config.CAT_DETECTOR_MODEL_PATH,
+        Config.CAT_DETECTOR_ONNX_PATH,
+        Config.CAT_DETECTOR_TFLITE_PATH,
+        Config.CAT_DETECTOR_TRT_PATH
     )
     # Load cat sound classifier model and label encoder
-    cat_sound_model, cat_sound_label_encoder = load_model_assets(
-        Config.MODEL_PATH, Config.LABEL_ENCODER_PATH
+    cat_sound_label_encoder = load_label_encoder(Config.LABEL_ENCODER_PATH)
+    cat_sound_fn = load_inference_fn(
+        Config.MODEL_PATH,
+        Config.MODEL_ONNX_PATH,
+        Config.MODEL_TFLITE_PATH,
+        Config.MODEL_TRT_PATH
     )
+    # Plain Python class lists, so requests index them instead of calling inverse_transform
+    DET_CLASSES = cat_detector_label_encoder.classes_.tolist()
+    SOUND_CLASSES = cat_sound_label_encoder.classes_.tolist()
+    DET_CLASS_INDEX = {label: idx for idx, label in enumerate(DET_CLASSES)}
+    SOUND_CLASS_INDEX = {label: idx for idx, label in enumerate(SOUND_CLASSES)}
+    # Index of the "cat" class, so detection is an integer comparison per request
+    CAT_IDX = DET_CLASS_INDEX["cat"]
+    cat_detector_batcher = Batcher(cat_detector_fn, Config.MAX_BATCH_SIZE, Config.MAX_BATCH_WAIT)
+    cat_sound_batcher = Batcher(cat_sound_fn, Config.MAX_BATCH_SIZE, Config.MAX_BATCH_WAIT)
 except Exception as e:
     logger.critical(f"Application startup failed: {str(e)}")
     raise
@@ -246,12 +969,23 @@ except Exception as e:
 app = FastAPI(
     title="Cat Sound Classifier API",
     description="API for classifying cat sounds",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson serializes the probability dicts and history lists in C
+    default_response_class=ORJSONResponse
 )
 
 @app.on_event("startup")
 async def startup_event():
     await init_db()
+    # Created here so it binds to the server's event loop
+    model_semaphore = asyncio.Semaphore(Config.MODEL_CONCURRENCY)
+    cat_detector_batcher.start(model_semaphore)
+    cat_sound_batcher.start(model_semaphore)
+    prediction_writer.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await prediction_writer.stop()
 
 # CORS Middleware
 app.add_middleware(
@@ -263,22 +997,10 @@ app.add_middleware(
 
 # Static files and templates
 app.mount("/static", StaticFiles(directory=str(Config.STATIC_DIR)), name="static")
+# Saved audio is served by StaticFiles at /static/audio/<file>; a reverse proxy
+# in front of uvicorn can serve that directory directly instead
 templates = Jinja2Templates(directory="templates")
 
-# Add explicit route for audio files
-@app.get("/static/audio/{filename}")
-async def get_audio_file(filename: str):
-    try:
-        file_path = Config.AUDIO_DIR / filename
-        logger.info(f"Attempting to serve audio file from: {file_path}")
-        if not file_path.exists():
-            logger.error(f"Audio file not found at: {file_path}")
-            raise HTTPException(status_code=404, detail="Audio file not found")
-        return FileResponse(str(file_path), media_type="audio/wav")
-    except Exception as e:
-        logger.error(f"Error serving audio file {filename}: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
-
 # ======================
 # 7. API ENDPOINTS
 # ======================
@@ -287,6 +1009,7 @@ async def predict(
     file: UploadFile = File(...),
     file_id: str = Form(None) 
 ):
+    save_task = None
     try:
         # Validate file size
         file.file.seek(0, 2)
@@ -300,57 +1023,62 @@ async def predict(
             )
 
         audio_data = await file.read()
+
+        # Write the upload to disk in the background while the models run
+        save_task = asyncio.create_task(
+            asyncio.to_thread(save_audio_file, file.filename, audio_data)
+        )
         
         # Generate file_id if not provided from frontend
         if not file_id:
             file_id = str(uuid.uuid4())  # Fallback to UUID if missing
         
         # Offload processing to thread pool
-        features = await asyncio.get_event_loop().run_in_executor(
-            executor,
-            process_audio_file,
-            audio_data
-        )
+        key, features = await get_features(audio_data, process_audio_file)
         
         # --- Stage 1: Cat Detector ---
-        cat_detector_proba = await asyncio.get_event_loop().run_in_executor(
-            executor,
-            lambda: cat_detector_model.predict(features)[0]
+        cat_detector_proba = await get_prediction(cat_detector_batcher, key, features)
+        cat_detector_pred_class, cat_detector_confidence = top1(cat_detector_proba)
+        cat_detector_class_name = DET_CLASSES[cat_detector_pred_class]
+        # Low-confidence "cat" predictions skip the sound classifier
+        cat_detected = (
+            cat_detector_pred_class == CAT_IDX
+            and cat_detector_confidence >= Config.CAT_DETECTION_THRESHOLD
         )
-        cat_detector_pred_class = np.argmax(cat_detector_proba)
-        cat_detector_class_name = cat_detector_label_encoder.inverse_transform([cat_detector_pred_class])[0]
-        cat_detector_confidence = float(cat_detector_proba.max())
-        cat_detected = cat_detector_class_name == "cat"
-        
-        # Save audio file 
-        saved_filename = save_audio_file(file.filename, audio_data)
-        audio_url = f"/static/audio/{saved_filename}"
         
         # --- Stage 2: Cat Sound Classifier (only if cat detected) ---
         cat_sound_prediction = None
         cat_sound_confidence = None
         cat_sound_probabilities = None
+        message = None
         if cat_detected:
-            cat_sound_proba = await asyncio.get_event_loop().run_in_executor(
-                executor,
-                lambda: cat_sound_model.predict(features)[0]
-            )
-            cat_sound_pred_class = np.argmax(cat_sound_proba)
-            cat_sound_class_name = cat_sound_label_encoder.inverse_transform([cat_sound_pred_class])[0]
-            cat_sound_confidence = float(cat_sound_proba.max())
+            cat_sound_proba = await get_prediction(cat_sound_batcher, key, features)
+            cat_sound_pred_class, cat_sound_confidence = top1(cat_sound_proba)
+            cat_sound_class_name = SOUND_CLASSES[cat_sound_pred_class]
             cat_sound_prediction = cat_sound_class_name
-            cat_sound_probabilities = {label: float(prob) for label, prob in zip(cat_sound_label_encoder.classes_, cat_sound_proba)}
+            cat_sound_probabilities = dict(zip(SOUND_CLASSES, cat_sound_proba.tolist()))
+            history_prediction, history_confidence = cat_sound_prediction, cat_sound_confidence
+        else:
+            message = skipped_stage2_message(cat_detector_pred_class)
+            if cat_detector_pred_class == CAT_IDX:
+                # Keep below-threshold "cat" apart from confident detections in the history
+                history_prediction = Config.LOW_CONFIDENCE_CAT_LABEL
+            else:
+                history_prediction = cat_detector_class_name
+            history_confidence = cat_detector_confidence
         
-        # Store prediction in database (with file_id)
-        async with AsyncSessionLocal() as db:
-            db_prediction = Prediction(
-                id=file_id,  
-                filename=saved_filename,
-                prediction=cat_detector_class_name if not cat_detected else cat_sound_prediction,
-                confidence=cat_detector_confidence if not cat_detected else cat_sound_confidence
-            )
-            db.add(db_prediction)
-            await db.commit()
+        saved_filename = await save_task
+        audio_url = f"/static/audio/{saved_filename}"
+
+        # Store prediction in database (with file_id); committed in batches in the background,
+        # so a duplicate file_id is logged by the writer rather than failing this request
+        prediction_writer.submit({
+            "id": file_id,
+            "timestamp": datetime.utcnow(),
+            "filename": saved_filename,
+            "prediction": history_prediction,
+            "confidence": history_confidence
+        })
         
         return {
             "success": True,
@@ -360,12 +1088,15 @@ async def predict(
             "cat_sound_prediction": cat_sound_prediction,
             "cat_sound_confidence": cat_sound_confidence,
             "audio_url": audio_url,
-            "probabilities": {label: float(prob) for label, prob in zip(cat_detector_label_encoder.classes_, cat_detector_proba)},
-            "cat_sound_probabilities": cat_sound_probabilities
+            "probabilities": dict(zip(DET_CLASSES, cat_detector_proba.tolist())),
+            "cat_sound_probabilities": cat_sound_probabilities,
+            "message": message
         }
     
     except Exception as e:
         logger.error(f"Prediction failed: {str(e)}")
+        if save_task is not None:
+            await discard_saved_audio(save_task)
         raise HTTPException(status_code=500, detail="Internal server error")
     
 @app.get("/api/history", response_model=List[HistoryResponse])
@@ -426,6 +1157,10 @@ async def delete_history(request: DeleteRequest):
             detail="Database error during deletion"
         )
 
+async def send_orjson(websocket: WebSocket, payload: dict):
+    """Send a JSON text frame serialized with orjson, like the HTTP responses"""
+    await websocket.send_text(orjson.dumps(payload).decode())
+
 @app.websocket("/ws/realtime_predict")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
@@ -438,43 +1173,45 @@ async def websocket_endpoint(websocket: WebSocket):
             try:
                 audio_bytes = base64.b64decode(data)
                 # Process audio chunk
-                features = process_audio_file(audio_bytes)
+                key, features = await get_features(audio_bytes, process_audio_file)
                 
                 # --- Stage 1: Cat Detector ---
-                cat_detector_proba = cat_detector_model.predict(features)[0]
-                cat_detector_pred_class = np.argmax(cat_detector_proba)
-                cat_detector_class_name = cat_detector_label_encoder.inverse_transform([cat_detector_pred_class])[0]
-                cat_detector_confidence = float(cat_detector_proba.max())
-                cat_detected = cat_detector_class_name == "cat"
+                cat_detector_proba = await get_prediction(cat_detector_batcher, key, features)
+                cat_detector_pred_class, cat_detector_confidence = top1(cat_detector_proba)
+                cat_detector_class_name = DET_CLASSES[cat_detector_pred_class]
+                # Low-confidence "cat" predictions skip the sound classifier
+                cat_detected = (
+                    cat_detector_pred_class == CAT_IDX
+                    and cat_detector_confidence >= Config.CAT_DETECTION_THRESHOLD
+                )
 
                 if not cat_detected:
-                    await websocket.send_json({
+                    await send_orjson(websocket, {
                         "success": True,
                         "cat_detected": False,
                         "cat_detector_prediction": cat_detector_class_name,
                         "cat_detector_confidence": cat_detector_confidence,
-                        "message": "Not a cat sound"
+                        "message": skipped_stage2_message(cat_detector_pred_class)
                     })
                     continue
 
                 # --- Stage 2: Cat Sound Classifier ---
-                proba = cat_sound_model.predict(features)[0]
-                pred_class = np.argmax(proba)
-                class_name = cat_sound_label_encoder.inverse_transform([pred_class])[0]
-                confidence = float(proba.max())
+                proba = await get_prediction(cat_sound_batcher, key, features)
+                pred_class, confidence = top1(proba)
+                class_name = SOUND_CLASSES[pred_class]
                 
                 # Send prediction back to client
-                await websocket.send_json({
+                await send_orjson(websocket, {
                     "success": True,
                     "cat_detected": True,
                     "cat_detector_prediction": cat_detector_class_name,
                     "cat_detector_confidence": cat_detector_confidence,
                     "prediction": class_name,
                     "confidence": confidence,
-                    "probabilities": {label: float(prob) for label, prob in zip(cat_sound_label_encoder.classes_, proba)}
+                    "probabilities": dict(zip(SOUND_CLASSES, proba.tolist()))
                 })
             except Exception as e:
-                await websocket.send_json({
+                await send_orjson(websocket, {
                     "success": False,
                     "error": str(e)
                 })
@@ -508,21 +1245,17 @@ async def realtime_predict(
         audio_data = await audio.read()
         
         # Process audio using realtime processing
-        features = await asyncio.get_event_loop().run_in_executor(
-            executor,
-            process_realtime_audio,  # Use realtime processing
-            audio_data
-        )
+        key, features = await get_features(audio_data, process_realtime_audio)
         
         # --- Stage 1: Cat Detector ---
-        cat_detector_proba = await asyncio.get_event_loop().run_in_executor(
-            executor,
-            lambda: cat_detector_model.predict(features)[0]
+        cat_detector_proba = await get_prediction(cat_detector_batcher, key, features)
+        cat_detector_pred_class, cat_detector_confidence = top1(cat_detector_proba)
+        cat_detector_class_name = DET_CLASSES[cat_detector_pred_class]
+        # Low-confidence "cat" predictions skip the sound classifier
+        cat_detected = (
+            cat_detector_pred_class == CAT_IDX
+            and cat_detector_confidence >= Config.CAT_DETECTION_THRESHOLD
         )
-        cat_detector_pred_class = np.argmax(cat_detector_proba)
-        cat_detector_class_name = cat_detector_label_encoder.inverse_transform([cat_detector_pred_class])[0]
-        cat_detector_confidence = float(cat_detector_proba.max())
-        cat_detected = cat_detector_class_name == "cat"
 
         if not cat_detected:
             return {
@@ -530,17 +1263,13 @@ async def realtime_predict(
                 "cat_detected": False,
                 "cat_detector_prediction": cat_detector_class_name,
                 "cat_detector_confidence": cat_detector_confidence,
-                "message": "Not a cat sound"
+                "message": skipped_stage2_message(cat_detector_pred_class)
             }
 
         # --- Stage 2: Cat Sound Classifier ---
-        proba = await asyncio.get_event_loop().run_in_executor(
-            executor,
-            lambda: cat_sound_model.predict(features)[0]
-        )
-        pred_class = np.argmax(proba)
-        class_name = cat_sound_label_encoder.inverse_transform([pred_class])[0]
-        confidence = float(proba.max())
+        proba = await get_prediction(cat_sound_batcher, key, features)
+        pred_class, confidence = top1(proba)
+        class_name = SOUND_CLASSES[pred_class]
         
         return {
             "success": True,
@@ -549,7 +1278,7 @@ async def realtime_predict(
             "cat_detector_confidence": cat_detector_confidence,
             "prediction": class_name,
             "confidence": confidence,
-            "probabilities": {label: float(prob) for label, prob in zip(cat_sound_label_encoder.classes_, proba)}
+            "probabilities": dict(zip(SOUND_CLASSES, proba.tolist()))
         }
     
     except ValueError as e:
@@ -71,7 +71,7 @@ class FilePickerPageState extends State<FilePickerPage> {
                   ? "${(data['cat_sound_confidence'] * 100).toStringAsFixed(2)}%"
                   : "0.00%";
             } else {
-              predictionResult = "Not a cat sound";
+              predictionResult = data['message']?.toString() ?? "Not a cat sound";
               confidenceLevel = data['cat_detector_confidence'] != null 
                   ? "${(data['cat_detector_confidence'] * 100).toStringAsFixed(2)}%"
                   : "0.00%";
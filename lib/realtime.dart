@@ -372,7 +372,7 @@ class RealTimePageState extends State<RealTimePage> {
               _predictionResult = data['prediction'] ?? 'Unknown';
               _confidenceLevel = '${(data['confidence'] * 100).toStringAsFixed(2)}%';
           } else {
-              _predictionResult = 'Not a cat sound';
+              _predictionResult = data['message']?.toString() ?? 'Not a cat sound';
               _confidenceLevel = '${(data['cat_detector_confidence'] * 100).toStringAsFixed(2)}%';
             }
             });